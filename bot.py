@@ -1,62 +1,55 @@
 import os
 import time
-import uuid
 import logging
 import asyncio
 import functools
 import base64
 import threading
-from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
 from flask import Flask, render_template, jsonify
 
 from pyrogram import Client, filters
 from pyrogram.types import Message, InlineKeyboardMarkup, InlineKeyboardButton
+from pyrogram.enums import ParseMode
 from pyrogram.errors import MessageNotModified
 
 import boto3
+import psutil
 from botocore.config import Config
 from botocore.exceptions import ClientError
-from boto3.s3.transfer import TransferConfig
 
 # --- 1. CONFIGURATION AND ENVIRONMENT SETUP ---
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO").upper()
+LOG_LEVELS = logging.getLevelNamesMapping()
+logging.basicConfig(level=LOG_LEVELS.get(LOG_LEVEL, logging.INFO), format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
+if LOG_LEVEL not in LOG_LEVELS:
+    logger.warning("Unknown LOG_LEVEL %r, using INFO", LOG_LEVEL)
 
-# Load environment variables
-API_ID = os.environ.get("API_ID")
-API_HASH = os.environ.get("API_HASH")
-BOT_TOKEN = os.environ.get("BOT_TOKEN")
+# The AWS stack logs wire/signing detail per request; keep it quiet even when LOG_LEVEL=DEBUG
+for noisy_logger in ("botocore", "boto3", "s3transfer", "urllib3"):
+    logging.getLogger(noisy_logger).setLevel(logging.WARNING)
 
-WASABI_ACCESS_KEY = os.environ.get("WASABI_ACCESS_KEY")
-WASABI_SECRET_KEY = os.environ.get("WASABI_SECRET_KEY")
-WASABI_BUCKET = os.environ.get("WASABI_BUCKET")
-WASABI_REGION = os.environ.get("WASABI_REGION")
+# Load environment variables (shared with utils.py through config.py)
+try:
+    from config import config
+    from utils import utils
+except ValueError as e:
+    logger.error("%s. Please set all variables.", e)
+    exit(1)
 
 # Render-specific configuration
 RENDER_URL = os.environ.get("RENDER_EXTERNAL_URL")  # Render provides this automatically
 FLASK_HOST = os.environ.get("FLASK_HOST", "0.0.0.0")
 FLASK_PORT = int(os.environ.get("PORT", "10000"))  # Render uses PORT environment variable
 
-# Check for required variables
-if not all([API_ID, API_HASH, BOT_TOKEN, WASABI_ACCESS_KEY, WASABI_SECRET_KEY, WASABI_BUCKET, WASABI_REGION]):
-    logger.error("One or more required environment variables are missing. Please set all variables.")
-    exit(1)
-
 # Use Render URL if available, otherwise construct local URL
 if RENDER_URL:
     BASE_URL = RENDER_URL.rstrip('/')
-    logger.info(f"Using Render URL: {BASE_URL}")
+    logger.info("Using Render URL: %s", BASE_URL)
 else:
     BASE_URL = f"http://{FLASK_HOST}:{FLASK_PORT}"
-    logger.info(f"Using local URL: {BASE_URL}")
-
-# Wasabi Endpoint Construction
-WASABI_ENDPOINT = f"https://s3.{WASABI_REGION}.wasabisys.com"
-
-# Constants
-MB = 1024 ** 2
-MAX_FILE_SIZE = 4 * 1024 ** 3  # 4GB
-URL_EXPIRY = 604800  # 7 days
+    logger.info("Using local URL: %s", BASE_URL)
 
 # --- 2. FLASK APP FOR MEDIA PLAYER ---
 flask_app = Flask(__name__, template_folder="templates")
@@ -74,10 +67,10 @@ def player(media_type, encoded_url):
         if padding != 4:
             encoded_url += '=' * padding
         media_url = base64.urlsafe_b64decode(encoded_url).decode()
-        logger.info(f"Serving media: {media_type} - {media_url[:50]}...")
+        logger.debug("Serving media: %s - %.50s...", media_type, media_url)
         return render_template("player.html", media_type=media_type, media_url=media_url)
     except Exception as e:
-        logger.error(f"Error decoding URL: {str(e)}")
+        logger.error("Error decoding URL: %s", e)
         return f"Error decoding URL: {str(e)}", 400
 
 @flask_app.route("/health")
@@ -88,123 +81,287 @@ def run_flask():
     flask_app.run(host=FLASK_HOST, port=FLASK_PORT, debug=False)
 
 # --- 3. WASABI (BOTO3) INITIALIZATION ---
+def memory_limit() -> int:
+    """Memory this process may use: MEMORY_LIMIT, else the cgroup limit, else physical RAM"""
+    if config.MEMORY_LIMIT:
+        return config.MEMORY_LIMIT
+    # psutil reports host RAM inside a container, so prefer the cgroup limit (v2, then v1)
+    total = psutil.virtual_memory().total
+    for path in ("/sys/fs/cgroup/memory.max", "/sys/fs/cgroup/memory/memory.limit_in_bytes"):
+        try:
+            with open(path) as f:
+                value = f.read().strip()
+        except OSError:
+            continue
+        if value.isdigit():
+            return min(int(value), total)
+    return total
+
+MIN_PART_SIZE = 8 * 1024 ** 2
+MEMORY_LIMIT = memory_limit()
+
+# Upload buffers live in RAM, so keep them within half the memory limit with every slot busy.
+# A single-part upload holds its chunks plus the joined body (files up to MIN_PART_SIZE); a
+# multipart upload holds its in-flight parts, the part being filled and that part's joined copy.
+_max_part_size = max(MIN_PART_SIZE, config.MULTIPART_CHUNKSIZE)
+_buffer_budget = MEMORY_LIMIT // 2 - config.MAX_CONCURRENT_SMALL_UPLOADS * 2 * MIN_PART_SIZE
+_parts_per_upload = _buffer_budget // (config.MAX_CONCURRENT_UPLOADS * _max_part_size)
+PART_CONCURRENCY = max(1, min(config.MAX_CONCURRENT_PARTS, _parts_per_upload - 2))
+if _parts_per_upload < 3:
+    logger.warning("Upload buffers may exceed half of the %s memory limit; lower MAX_CONCURRENT_UPLOADS, "
+                   "MAX_CONCURRENT_SMALL_UPLOADS or MULTIPART_CHUNKSIZE", utils.format_size(MEMORY_LIMIT))
+elif PART_CONCURRENCY < config.MAX_CONCURRENT_PARTS:
+    logger.warning("Limiting parts in flight per upload to %d to fit in memory", PART_CONCURRENCY)
+
+# One pooled connection per in-flight part, plus headroom for create/complete/presign calls
+S3_MAX_CONNECTIONS = config.MAX_CONCURRENT_UPLOADS * PART_CONCURRENCY + config.MAX_CONCURRENT_SMALL_UPLOADS + 8
+
+# Blocking S3 calls get their own threads so they never queue behind (or starve) the default executor
+s3_executor = ThreadPoolExecutor(max_workers=S3_MAX_CONNECTIONS, thread_name_prefix="s3")
+
 try:
     s3_config = Config(
         signature_version='s3v4',
-        connect_timeout=60,
+        connect_timeout=10,
         read_timeout=60,
-        retries={'max_attempts': 10, 'mode': 'standard'}
-    )
-    
-    transfer_config = TransferConfig(
-        multipart_threshold=100 * MB,
-        max_concurrency=20,
-        multipart_chunksize=25 * MB,
-        use_threads=True
+        retries={'max_attempts': 10, 'mode': 'adaptive'},
+        max_pool_connections=S3_MAX_CONNECTIONS,
+        tcp_keepalive=True
     )
 
     s3_client = boto3.client(
         's3',
-        endpoint_url=WASABI_ENDPOINT,
-        aws_access_key_id=WASABI_ACCESS_KEY,
-        aws_secret_access_key=WASABI_SECRET_KEY,
-        region_name=WASABI_REGION,
+        endpoint_url=config.WASABI_ENDPOINT,
+        aws_access_key_id=config.WASABI_ACCESS_KEY,
+        aws_secret_access_key=config.WASABI_SECRET_KEY,
+        region_name=config.WASABI_REGION,
         config=s3_config
     )
-    logger.info(f"Wasabi S3 Client Initialized for region: {WASABI_REGION}")
+    logger.info("Wasabi S3 Client Initialized for region: %s", config.WASABI_REGION)
 except Exception as e:
-    logger.error(f"Error initializing Boto3 client: {e}")
+    logger.error("Error initializing Boto3 client: %s", e)
     exit(1)
 
+def warm_up_s3():
+    # Open the first pooled TLS connection and surface a wrong bucket/credentials early.
+    # Runs in s3_executor so a slow or unreachable Wasabi never delays Flask binding PORT.
+    try:
+        s3_client.head_bucket(Bucket=config.WASABI_BUCKET)
+    except Exception as e:
+        logger.warning("Wasabi bucket check failed: %s", e)
+
 # --- 4. PYROGRAM BOT INITIALIZATION ---
+# uvloop has to be installed before the Client picks up its event loop
+try:
+    import uvloop
+    uvloop.install()
+    logger.info("Using uvloop event loop.")
+except ImportError:
+    pass  # Windows or uvloop not installed: keep the default asyncio loop
+
 app = Client(
     "wasabi_file_bot",
-    api_id=int(API_ID),
-    api_hash=API_HASH,
-    bot_token=BOT_TOKEN
+    api_id=config.API_ID,
+    api_hash=config.API_HASH,
+    bot_token=config.BOT_TOKEN
 )
 logger.info("Pyrogram Client Initialized.")
 
 # --- 5. PROGRESS TRACKING & UTILITIES ---
 processing_messages = set()
+# Separate caps so a queue of multi-GB uploads never holds up files that fit in a single part
+large_upload_slots = asyncio.Semaphore(config.MAX_CONCURRENT_UPLOADS)
+small_upload_slots = asyncio.Semaphore(config.MAX_CONCURRENT_SMALL_UPLOADS)
+
+# Sent with parse_mode disabled: progress edits carry no user markup, so there is nothing to parse
+PROGRESS_TEMPLATE = (
+    "🔄 WASABI UPLOAD PROGRESS\n━━━━━━━━━━━━━━━━━━━━\n"
+    "Uploaded: {current} / {total}\nSpeed: {speed}/s\n"
+    "Progress: [{bar}] {percentage:.1f}%"
+)
+PROGRESS_BARS = tuple('▓' * filled + '░' * (10 - filled) for filled in range(11))
 
 class ProgressTracker:
-    def __init__(self, client: Client, message: Message, total: int):
-        self.client = client
+    """Reports upload progress from a single ticker task.
+
+    update() only bumps a counter, so part uploads never schedule edits
+    themselves; the ticker edits the message at most once per interval.
+    """
+
+    def __init__(self, message: Message, total: int, interval: float):
         self.message = message
         self.total = total
+        self.interval = interval
         self._current = 0
-        self._start_time = time.time()
-        self._last_edit_time = 0.0
+        self._start_time = time.monotonic()
+        self._total_text = utils.format_size(total)
+        self._reported = -1
+        self._ticker = None
+
+    def start(self):
+        self._ticker = asyncio.create_task(self._tick())
+
+    async def stop(self):
+        if self._ticker:
+            self._ticker.cancel()
+            await asyncio.gather(self._ticker, return_exceptions=True)
+            self._ticker = None
 
     def update(self, chunk: int):
         self._current += chunk
-        now = time.time()
-        if (now - self._last_edit_time) < 1.0:
-            return
-        self._last_edit_time = now
-        self.client.loop.call_soon_threadsafe(
-            asyncio.create_task,
-            self._edit_message_progress()
-        )
+
+    async def _tick(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            await self._edit_message_progress()
 
     async def _edit_message_progress(self):
+        # Nothing new since the last edit; skip the RPC instead of eating MessageNotModified
+        if self._current == self._reported:
+            return
+        self._reported = self._current
         percentage = min(100.0, (self._current * 100) / self.total)
-        elapsed = time.time() - self._start_time
-        speed = (self._current / elapsed) / MB if elapsed > 0 else 0.0
-        status = f"**🔄 Wasabi Upload Progress**\n━━━━━━━━━━━━━━━━━━━━\n**Uploaded:** `{self._current / MB:.2f} MB` / `{self.total / MB:.2f} MB`\n**Speed:** `{speed:.2f} MB/s`\n**Progress:** `[{'▓' * int(percentage // 10):<10}] {percentage:.1f}%`"
+        elapsed = time.monotonic() - self._start_time
+        speed = self._current / elapsed if elapsed > 0 else 0.0
+        status = PROGRESS_TEMPLATE.format(
+            current=utils.format_size(self._current), total=self._total_text, speed=utils.format_size(speed),
+            bar=PROGRESS_BARS[int(percentage // 10)], percentage=percentage)
         try:
-            await self.message.edit_text(status)
+            await self.message.edit_text(status, parse_mode=ParseMode.DISABLED)
         except MessageNotModified:
             pass
         except Exception as e:
-            logger.warning(f"Failed to edit progress message: {e}")
+            logger.warning("Failed to edit progress message: %s", e)
 
-async def pyrogram_progress_callback(current, total, client, message):
-    now = time.time()
-    if (now - message.data.get('last_edit_time', 0.0)) < 1.0:
-        return
-    message.data['last_edit_time'] = now
-    percentage = min(100.0, (current * 100) / total)
-    elapsed = now - message.data.get('start_time', now)
-    speed = (current / elapsed) / MB if elapsed > 0 else 0.0
-    status = f"**⬇️ Telegram Download Progress**\n━━━━━━━━━━━━━━━━━━━━\n**Downloaded:** `{current / MB:.2f} MB` / `{total / MB:.2f} MB`\n**Speed:** `{speed:.2f} MB/s`\n**Progress:** `[{'▓' * int(percentage // 10):<10}] {percentage:.1f}%`"
-    try:
-        await client.edit_message_text(message.chat.id, message.id, status)
-    except MessageNotModified:
-        pass
-    except Exception as e:
-        logger.warning(f"Failed to edit download progress message: {e}")
+MEDIA_TYPES = {
+    **dict.fromkeys(['.mp4', '.avi', '.mkv', '.mov', '.wmv', '.flv', '.webm', '.m4v'], 'video'),
+    **dict.fromkeys(['.mp3', '.wav', '.ogg', '.m4a', '.flac', '.aac', '.wma'], 'audio'),
+}
 
 def get_media_type(file_name):
-    video_extensions = ['.mp4', '.avi', '.mkv', '.mov', '.wmv', '.flv', '.webm', '.m4v']
-    audio_extensions = ['.mp3', '.wav', '.ogg', '.m4a', '.flac', '.aac', '.wma']
     file_ext = os.path.splitext(file_name.lower())[1]
-    if file_ext in video_extensions:
-        return 'video'
-    elif file_ext in audio_extensions:
-        return 'audio'
-    else:
-        return 'document'
+    return MEDIA_TYPES.get(file_ext, 'document')
+
+def choose_part_size(file_size: int) -> int:
+    # Aim for ~4 rounds of PART_CONCURRENCY so mid-sized files still upload in parallel,
+    # capped at MULTIPART_CHUNKSIZE because every in-flight part is held in memory
+    target = file_size // (PART_CONCURRENCY * 4)
+    return max(MIN_PART_SIZE, min(config.MULTIPART_CHUNKSIZE, target))
+
+async def stream_to_wasabi(client: Client, message: Message, key: str, tracker: ProgressTracker,
+                           file_size: int, part_size: int):
+    """Pipe a Telegram file into a Wasabi multipart upload without staging it on disk.
+
+    Parts are uploaded from the executor while the next one is still being
+    received, so at most PART_CONCURRENCY + 2 parts of part_size are held in memory
+    (in-flight parts, the one being filled, and its joined copy).
+    Files whose size fits in one part skip multipart and go up with one PutObject.
+    """
+    loop = asyncio.get_running_loop()
+    if file_size <= part_size:
+        body = b"".join([chunk async for chunk in client.stream_media(message)])
+        await loop.run_in_executor(s3_executor, functools.partial(
+            s3_client.put_object, Bucket=config.WASABI_BUCKET, Key=key, Body=body))
+        tracker.update(len(body))
+        return
+
+    part_slots = asyncio.Semaphore(PART_CONCURRENCY)
+    pending = []
+    part_futures = []
+    upload_id = None
+
+    async def upload_part(part_number: int, body: bytes):
+        # Keep the executor future: cancelling the task does not stop a request already on a thread
+        future = s3_executor.submit(functools.partial(
+            s3_client.upload_part, Bucket=config.WASABI_BUCKET, Key=key,
+            UploadId=upload_id, PartNumber=part_number, Body=body))
+        part_futures.append(future)
+        try:
+            response = await asyncio.wrap_future(future)
+        finally:
+            part_slots.release()
+        tracker.update(len(body))
+        return {'PartNumber': part_number, 'ETag': response['ETag']}
+
+    async def abort_upload():
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        # Queued parts were cancelled above; wait out the ones already sending so the
+        # abort is the last request and Wasabi never keeps a part that landed after it
+        await asyncio.gather(*(asyncio.wrap_future(future) for future in part_futures), return_exceptions=True)
+        if upload_id is not None:
+            try:
+                await loop.run_in_executor(s3_executor, functools.partial(
+                    s3_client.abort_multipart_upload, Bucket=config.WASABI_BUCKET, Key=key, UploadId=upload_id))
+            except Exception as e:
+                logger.warning("Failed to abort multipart upload %s: %s", upload_id, e)
+
+    async def submit(body: bytes):
+        nonlocal upload_id
+        if upload_id is None:
+            upload = await loop.run_in_executor(s3_executor, functools.partial(
+                s3_client.create_multipart_upload, Bucket=config.WASABI_BUCKET, Key=key))
+            upload_id = upload['UploadId']
+        await part_slots.acquire()
+        # Stop pulling from Telegram as soon as any earlier part has failed
+        for task in pending:
+            if task.done() and task.exception():
+                part_slots.release()
+                raise task.exception()
+        pending.append(asyncio.create_task(upload_part(len(pending) + 1, body)))
+
+    try:
+        # Collect chunk references and join once per part: one memcpy instead of extend + bytes().
+        # The chunk list is still alive while join builds the part, so peak use is briefly two parts;
+        # drop it before waiting for a part slot so only the joined body is held while blocked
+        chunks, buffered = [], 0
+        async for chunk in client.stream_media(message):
+            chunks.append(chunk)
+            buffered += len(chunk)
+            if buffered >= part_size:
+                body = b"".join(chunks)
+                chunks, buffered = [], 0
+                await submit(body)
+        if chunks:
+            await submit(b"".join(chunks))
+
+        parts = await asyncio.gather(*pending)
+        await loop.run_in_executor(s3_executor, functools.partial(
+            s3_client.complete_multipart_upload, Bucket=config.WASABI_BUCKET, Key=key,
+            UploadId=upload_id, MultipartUpload={'Parts': parts}))
+    except BaseException:
+        # Also runs on cancellation/shutdown; shielded so a second cancel can't cut the cleanup short
+        await asyncio.shield(abort_upload())
+        raise
 
 # --- 6. BOT HANDLERS ---
+WELCOME_TEXT = (
+    "👋 **Welcome to the Immortal Speed Wasabi Uploader Bot!**\n\n"
+    "This bot automatically handles large file uploads (up to 4GB+) to Wasabi "
+    "Cloud Storage using high-speed multipart transfer capabilities.\n\n"
+    "**How to use:**\n"
+    "1. Simply send me any file (Document, Video, or Audio).\n"
+    "2. The file will be uploaded, and I will provide you with multiple download options.\n\n"
+    "**Features:**\n• 🚀 Direct download links\n• 📺 Built-in media player for videos/audio\n• ⚡ High-speed multipart uploads\n• 🔒 Secure 7-day access links\n\n"
+    "**Service Status:** 🟢 24/7 Running Capacity Support"
+)
+READY_TEXT = "🔄 **Ready for another upload!**\n\nSend me any file and I'll upload it to Wasabi."
+UPLOAD_SUCCESS_TEMPLATE = (
+    "**⚡️ TRANSFER SUCCESSFUL!**\n\n**📁 File:** `{file_name}`\n**📊 Size:** `{size}`\n"
+    "**🎯 Type:** `{media_type}`\n**⏰ Expires:** `{expiry_days} days`\n\n{hint}"
+)
+PLAYER_HINT = "**Choose download method:**\n• 🎬 **Media Player** - Stream in browser\n• 🚀 **Direct Download** - Download file"
+DIRECT_HINT = "Click **🚀 Direct Download** to get your file!"
+UPLOAD_ANOTHER_BUTTON = InlineKeyboardButton("🔄 Upload Another", callback_data="upload_another")
+
 @app.on_message(filters.command("start") & filters.private)
 async def start_command(client: Client, message: Message):
-    welcome_text = (
-        "👋 **Welcome to the Immortal Speed Wasabi Uploader Bot!**\n\n"
-        "This bot automatically handles large file uploads (up to 4GB+) to Wasabi "
-        "Cloud Storage using high-speed multipart transfer capabilities.\n\n"
-        "**How to use:**\n"
-        "1. Simply send me any file (Document, Video, or Audio).\n"
-        "2. The file will be uploaded, and I will provide you with multiple download options.\n\n"
-        "**Features:**\n• 🚀 Direct download links\n• 📺 Built-in media player for videos/audio\n• ⚡ High-speed multipart uploads\n• 🔒 Secure 7-day access links\n\n"
-        "**Service Status:** 🟢 24/7 Running Capacity Support"
-    )
-    await message.reply_text(welcome_text)
+    await message.reply_text(WELCOME_TEXT)
 
 @app.on_callback_query(filters.regex("^upload_another$"))
 async def upload_another_callback(client, callback_query):
-    await callback_query.message.edit_text("🔄 **Ready for another upload!**\n\nSend me any file and I'll upload it to Wasabi.")
+    await callback_query.message.edit_text(READY_TEXT)
 
 @app.on_message(filters.private & (filters.document | filters.video | filters.audio))
 async def handle_file_upload(client: Client, message: Message):
@@ -215,80 +372,65 @@ async def handle_file_upload(client: Client, message: Message):
     
     try:
         file_info = message.document or message.video or message.audio
-        if file_info.file_size > MAX_FILE_SIZE:
+        if file_info.file_size > config.MAX_FILE_SIZE:
             await message.reply_text("❌ File size exceeds the 4GB bot capacity limit.")
             return
         
-        file_name = file_info.file_name or f"file-{uuid.uuid4().hex}"
+        file_name = file_info.file_name or f"file-{message.id}"
         file_size = file_info.file_size
-        temp_file_path = os.path.join(os.getcwd(), str(uuid.uuid4()))
-        wasabi_key = f"{message.from_user.id}/{uuid.uuid4().hex}/{file_name}"
+        # Message ids are unique within the user's private chat, which keeps keys unique per upload
+        wasabi_key = f"{message.from_user.id}/{message.id}/{file_name}"
         
         progress_msg = await message.reply_text("🔄 Starting file processing...")
-        progress_msg.data = {'start_time': time.time(), 'last_edit_time': 0.0}
-        download_path = None
 
-        # Download from Telegram
-        try:
-            await progress_msg.edit_text(f"**⬇️ Starting Telegram download for** `{file_name}` **({file_size / MB:.2f} MB)...**")
-            download_path = await client.download_media(message, file_name=temp_file_path, progress=pyrogram_progress_callback, progress_args=(client, progress_msg))
-            logger.info(f"Downloaded file to: {download_path}")
-            await progress_msg.edit_text("✅ **Download complete!** Starting Wasabi upload...")
-        except Exception as e:
-            logger.error(f"Error during Telegram download: {e}")
-            await progress_msg.edit_text(f"❌ Download failed: {e}")
-            return
-        
-        # Upload to Wasabi
+        # Stream from Telegram straight into Wasabi
         try:
-            tracker = ProgressTracker(client, progress_msg, file_size)
-            await progress_msg.edit_text(f"**⬆️ Starting Immortal Speed Wasabi upload for** `{file_name}` **...**")
-            upload_function = functools.partial(s3_client.upload_file, download_path, WASABI_BUCKET, wasabi_key, Callback=tracker.update, Config=transfer_config)
-            loop = asyncio.get_event_loop()
-            await loop.run_in_executor(None, upload_function)
+            tracker = ProgressTracker(progress_msg, file_size, interval=config.PROGRESS_INTERVAL)
+            await progress_msg.edit_text(f"**⬆️ Starting Immortal Speed Wasabi upload for** `{file_name}` **({utils.format_size(file_size)})...**")
+            part_size = choose_part_size(file_size)
+            upload_slots = small_upload_slots if file_size <= part_size else large_upload_slots
+            async with upload_slots:
+                tracker.start()
+                try:
+                    await stream_to_wasabi(client, message, wasabi_key, tracker, file_size, part_size)
+                finally:
+                    await tracker.stop()
             await tracker._edit_message_progress()
             await progress_msg.edit_text("🎉 **Wasabi Upload Complete!**\n\nGenerating download options...")
         except Exception as e:
-            logger.error(f"Error during Wasabi upload: {e}")
+            logger.error("Error during Wasabi upload: %s", e)
             await progress_msg.edit_text(f"❌ Wasabi Upload Failed: {e}")
-            if download_path and os.path.exists(download_path):
-                os.remove(download_path)
             return
 
         # Generate Download Options
         try:
-            url = s3_client.generate_presigned_url('get_object', Params={'Bucket': WASABI_BUCKET, 'Key': wasabi_key}, ExpiresIn=URL_EXPIRY)
-            expiry_date = datetime.now() + timedelta(seconds=URL_EXPIRY)
-            expiry_days = (expiry_date - datetime.now()).days
+            url = s3_client.generate_presigned_url('get_object', Params={'Bucket': config.WASABI_BUCKET, 'Key': wasabi_key}, ExpiresIn=config.URL_EXPIRY)
+            expiry_days = config.URL_EXPIRY // 86400
             media_type = get_media_type(file_name)
             player_url = None
             
             if media_type in ['video', 'audio']:
                 encoded_url = base64.urlsafe_b64encode(url.encode()).decode().rstrip('=')
                 player_url = f"{BASE_URL}/player/{media_type}/{encoded_url}"
-                logger.info(f"Generated player URL: {player_url}")
+                logger.debug("Generated %s player URL for %s", media_type, wasabi_key)
             
             buttons = []
             if player_url:
                 buttons.append([InlineKeyboardButton("🎬 Media Player", url=player_url)])
             buttons.append([InlineKeyboardButton("🚀 Direct Download", url=url)])
-            buttons.append([InlineKeyboardButton("🔄 Upload Another", callback_data="upload_another")])
+            buttons.append([UPLOAD_ANOTHER_BUTTON])
             
             keyboard = InlineKeyboardMarkup(buttons)
-            final_message = f"**⚡️ TRANSFER SUCCESSFUL!**\n\n**📁 File:** `{file_name}`\n**📊 Size:** `{file_size / MB:.2f} MB`\n**🎯 Type:** `{media_type.upper()}`\n**⏰ Expires:** `{expiry_days} days`\n\n"
-            final_message += "**Choose download method:**\n• 🎬 **Media Player** - Stream in browser\n• 🚀 **Direct Download** - Download file" if player_url else "Click **🚀 Direct Download** to get your file!"
+            final_message = UPLOAD_SUCCESS_TEMPLATE.format(
+                file_name=file_name, size=utils.format_size(file_size), media_type=media_type.upper(),
+                expiry_days=expiry_days, hint=PLAYER_HINT if player_url else DIRECT_HINT)
             
             await progress_msg.edit_text(final_message, reply_markup=keyboard)
-            logger.info(f"Generated URL for {file_name}")
+            logger.info("Generated URL for %s", file_name)
 
         except Exception as e:
-            logger.error(f"Error generating download options: {e}")
+            logger.error("Error generating download options: %s", e)
             await progress_msg.edit_text(f"❌ Failed to generate download options: {e}")
-
-        finally:
-            if download_path and os.path.exists(download_path):
-                os.remove(download_path)
-                logger.info(f"Cleaned up local file: {download_path}")
                 
     finally:
         processing_messages.discard(message_id)
@@ -298,6 +440,7 @@ if __name__ == "__main__":
     logger.info("Starting Wasabi File Upload Bot with Media Player...")
     flask_thread = threading.Thread(target=run_flask, daemon=True)
     flask_thread.start()
-    logger.info(f"Flask media player started on {BASE_URL}")
+    logger.info("Flask media player started on %s", BASE_URL)
+    s3_executor.submit(warm_up_s3)
     app.run()
         
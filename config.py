@@ -20,8 +20,15 @@ class Config:
         # Upload Configuration
         self.MAX_FILE_SIZE = 4 * 1024 ** 3  # 4GB
         self.URL_EXPIRY = 604800  # 7 days in seconds
-        self.MULTIPART_THRESHOLD = 100 * 1024 ** 2  # 100MB
-        self.MULTIPART_CHUNKSIZE = 25 * 1024 ** 2  # 25MB
+        # Part size for multipart uploads. Larger parts mean fewer round-trips per GB;
+        # S3 caps uploads at 10,000 parts, so even 5MB parts cover MAX_FILE_SIZE.
+        # Defaults keep upload buffers (~192MB with every slot busy) inside half of a 512MB instance.
+        self.MULTIPART_CHUNKSIZE = int(os.environ.get("MULTIPART_CHUNKSIZE", 16 * 1024 ** 2))  # 16MB
+        self.MAX_CONCURRENT_PARTS = int(os.environ.get("MAX_CONCURRENT_PARTS", 2))  # parts in flight per upload
+        self.MAX_CONCURRENT_UPLOADS = int(os.environ.get("MAX_CONCURRENT_UPLOADS", 2))  # multipart uploads streaming at once
+        self.MAX_CONCURRENT_SMALL_UPLOADS = int(os.environ.get("MAX_CONCURRENT_SMALL_UPLOADS", 4))  # single-part uploads at once
+        self.MEMORY_LIMIT = int(os.environ.get("MEMORY_LIMIT", 0))  # bytes; 0 = detect from cgroup/RAM
+        self.PROGRESS_INTERVAL = float(os.environ.get("PROGRESS_INTERVAL", 2.0))  # seconds between progress edits
         
         self._validate_config()
     
@@ -1,14 +1,20 @@
 import os
 import asyncio
 from typing import Optional
-import humanize
 from config import config
 
+SIZE_UNITS = ('B', 'KB', 'MB', 'GB', 'TB')
+
 class BotUtils:
     @staticmethod
     def format_size(size_bytes: int) -> str:
         """Format file size to human readable format"""
-        return humanize.naturalsize(size_bytes)
+        size_bytes = int(size_bytes)
+        if size_bytes <= 0:
+            return "0 B"
+        # bit_length picks the 1024-power directly instead of dividing in a loop
+        unit = min((size_bytes.bit_length() - 1) // 10, len(SIZE_UNITS) - 1)
+        return f"{size_bytes / (1 << (10 * unit)):.2f} {SIZE_UNITS[unit]}"
     
     @staticmethod
     def is_file_too_large(size_bytes: int) -> bool: